@@ -1,10 +1,21 @@
+import csv
+import hmac
+import io
 import os
 import json
 import secrets
+import threading
+from collections import deque
 from datetime import datetime
+from functools import lru_cache
 from urllib.parse import urlencode
 
-from flask import Flask, render_template, request, redirect, url_for, session, flash, g, Response
+from flask import Flask, render_template, request, redirect, url_for, session, flash, g, Response, make_response, stream_with_context
+
+try:
+    import orjson  # much faster than stdlib json; optional
+except ImportError:
+    orjson = None
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SECRET_KEY", "change_this_demo_secret")
@@ -15,33 +26,66 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 STATIC_IMG_PREFIX = "img/"  # url_for('static', filename=STATIC_IMG_PREFIX + <path>)
 
 PRODUCTS_PATH = os.path.join(DATA_DIR, "products.json")
-ORDERS_PATH = os.path.join(DATA_DIR, "orders.json")
-MESSAGES_PATH = os.path.join(DATA_DIR, "messages.json")
+ORDERS_PATH = os.path.join(DATA_DIR, "orders.jsonl")
+MESSAGES_PATH = os.path.join(DATA_DIR, "messages.jsonl")
+
+# Pre-JSONL stores: whole-document JSON rewritten on every submission.
+LEGACY_ORDERS_PATH = os.path.join(DATA_DIR, "orders.json")
+LEGACY_MESSAGES_PATH = os.path.join(DATA_DIR, "messages.json")
 
 ADMIN_KEY = os.environ.get("DEMO_ADMIN_KEY", "demo")
 
+# Flash strings, hoisted so hot handlers do a dict lookup instead of
+# building the zh/en ternary per call.
+_MSGS = {
+    "cart_added": {"zh": "已加入购物车", "en": "Added to cart."},
+    "cart_updated": {"zh": "购物车已更新", "en": "Cart updated."},
+    "need_contact": {"zh": "请填写姓名和联系方式", "en": "Please enter name and contact."},
+    "need_message": {"zh": "请填写消息内容", "en": "Please enter a message."},
+    "msg_sent": {"zh": "消息已发送", "en": "Message sent."},
+    "product_added": {"zh": "已添加商品", "en": "Product added."},
+    "updated": {"zh": "已更新", "en": "Updated."},
+}
+
 
 # -------------------------
 # Language
 # -------------------------
+@lru_cache(maxsize=16)
+def _normalize_lang(raw: str) -> str:
+    return "zh" if raw.strip().lower() in ("zh", "cn", "zh-cn", "zh-hans") else "en"
+
+
 def get_lang(default=DEFAULT_LANG):
-    raw = (request.args.get("lang") or session.get("lang") or default).strip().lower()
-    lang = "zh" if raw in ("zh", "cn", "zh-cn", "zh-hans") else "en"
-    session["lang"] = lang
+    lang = _normalize_lang(request.args.get("lang") or session.get("lang") or default)
+    # Only touch the session on an actual change; writing it on every
+    # request forces Flask to re-sign and re-emit the cookie.
+    if session.get("lang") != lang:
+        session["lang"] = lang
     g.lang = lang
     return lang
 
 
+@app.before_request
+def _precompute_switch_urls():
+    # Both language-switch links appear on every page; build them once per
+    # request instead of copying request.args per template call.
+    if request.endpoint in ("health", "static"):
+        return
+    args = request.args.to_dict(flat=True)
+    args["lang"] = "zh"
+    g.switch_zh_url = request.path + "?" + urlencode(args)
+    args["lang"] = "en"
+    g.switch_en_url = request.path + "?" + urlencode(args)
+
+
 @app.context_processor
 def inject_helpers():
-    def switch_lang_url(target_lang: str):
-        args = request.args.to_dict(flat=True)
-        args["lang"] = "zh" if target_lang in ("zh", "cn", "zh-cn", "zh-hans") else "en"
-        return request.path + "?" + urlencode(args)
-
     return {
         "lang": getattr(g, "lang", DEFAULT_LANG),
-        "switch_lang_url": switch_lang_url,
+        "cart_count": getattr(g, "cart_count", 0),
+        "switch_zh_url": getattr(g, "switch_zh_url", "?lang=zh"),
+        "switch_en_url": getattr(g, "switch_en_url", "?lang=en"),
         "ADMIN_KEY": ADMIN_KEY,
         "STATIC_IMG_PREFIX": STATIC_IMG_PREFIX,
     }
@@ -51,71 +95,284 @@ def inject_helpers():
 # Storage helpers
 # -------------------------
 def _read_json(path, default):
+    # Read the whole file into one buffer and parse that: faster than
+    # json.load's chunked reads, and the data files are at most a few MB.
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            buf = f.read()
+        return orjson.loads(buf) if orjson is not None else json.loads(buf)
     except Exception:
         return default
 
 
-def _write_json(path, payload):
+def _write_json(path, payload, fsync=False):
+    # Serialize to one bytes object and issue a single write() instead of
+    # letting the encoder drip tokens into the file handle.
+    if orjson is not None:
+        data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
     os.makedirs(os.path.dirname(path), exist_ok=True)
     tmp = path + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    with open(tmp, "wb") as f:
+        f.write(data)
+        if fsync:
+            os.fsync(f.fileno())
     os.replace(tmp, path)
 
 
+def _dumps_line(obj):
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _append_jsonl(path, obj, fsync=False):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(_dumps_line(obj))
+        if fsync:
+            os.fsync(f.fileno())
+
+
+def _iter_jsonl(path):
+    """Yield parsed records in file order (oldest first); missing file -> nothing."""
+    loads = orjson.loads if orjson is not None else json.loads
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield loads(line)
+                except Exception:
+                    continue
+    except OSError:
+        return
+
+
+def _read_jsonl(path):
+    return list(_iter_jsonl(path))
+
+
+def _tail_jsonl(path, limit):
+    """Last `limit` records, newest first; parses only the kept lines."""
+    loads = orjson.loads if orjson is not None else json.loads
+    try:
+        with open(path, "rb") as f:
+            last = deque(f, maxlen=limit)
+    except OSError:
+        return []
+    records = []
+    for line in reversed(last):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(loads(line))
+        except Exception:
+            continue
+    return records
+
+
+def _migrate_legacy(legacy_path, key, jsonl_path):
+    """One-shot: fold the old {key: [...]} document into the JSONL store."""
+    if os.path.exists(jsonl_path) or not os.path.exists(legacy_path):
+        return
+    # Legacy arrays were newest-first (insert at head); JSONL appends, so
+    # reverse to keep chronological file order.
+    records = _read_json(legacy_path, {key: []}).get(key, [])
+    with open(jsonl_path, "ab") as f:
+        for rec in reversed(records):
+            if key == "orders" and "line_items" not in rec and "items" in rec:
+                rec["line_items"] = rec.pop("items")  # pre-checkout-rewrite field name
+            f.write(_dumps_line(rec))
+    os.replace(legacy_path, legacy_path + ".bak")
+
+
 def _ensure_data():
     os.makedirs(DATA_DIR, exist_ok=True)
     if not os.path.exists(PRODUCTS_PATH):
-        _write_json(PRODUCTS_PATH, {"products": []})
-    if not os.path.exists(ORDERS_PATH):
-        _write_json(ORDERS_PATH, {"orders": []})
-    if not os.path.exists(MESSAGES_PATH):
-        _write_json(MESSAGES_PATH, {"messages": []})
+        _write_json(PRODUCTS_PATH, {"products": [], "next_product_id": 0})
+    _migrate_legacy(LEGACY_ORDERS_PATH, "orders", ORDERS_PATH)
+    _migrate_legacy(LEGACY_MESSAGES_PATH, "messages", MESSAGES_PATH)
+
+
+# Parsed catalog cached in memory; reloaded only when products.json changes
+# on disk (mtime check) or after an admin write invalidates it.
+_PRODUCTS_CACHE = {"mtime": -1, "items": (), "active": (), "by_slug": {},
+                   "slug_to_id": {}, "id_to_slug": {}, "next_id": 0}
+_PRODUCTS_LOCK = threading.Lock()
+
+
+def _invalidate_catalog():
+    with _PRODUCTS_LOCK:
+        _PRODUCTS_CACHE["mtime"] = -1
 
 
 def _catalog(include_inactive=False):
     _ensure_data()
-    items = _read_json(PRODUCTS_PATH, {"products": []}).get("products", [])
-    return items if include_inactive else [p for p in items if p.get("active", True)]
+    try:
+        mtime = os.stat(PRODUCTS_PATH).st_mtime_ns
+    except OSError:
+        mtime = -1
+    with _PRODUCTS_LOCK:
+        if mtime < 0 or mtime != _PRODUCTS_CACHE["mtime"]:
+            payload = _read_json(PRODUCTS_PATH, {"products": []})
+            items = tuple(payload.get("products", []))
+            next_id = payload.get("next_product_id")
+            if not isinstance(next_id, int):
+                next_id = max((p["id"] for p in items if isinstance(p.get("id"), int)), default=-1) + 1
+            if any("id" not in p for p in items):
+                # One-shot migration: stamp a persistent id on products from
+                # before ids existed, and record the counter so ids are never
+                # handed out twice even after deletes.
+                for p in items:
+                    if "id" not in p:
+                        p["id"] = next_id
+                        next_id += 1
+                _write_json(PRODUCTS_PATH, {"products": list(items), "next_product_id": next_id})
+                try:
+                    mtime = os.stat(PRODUCTS_PATH).st_mtime_ns
+                except OSError:
+                    mtime = -1
+            for p in items:
+                # Normalize the price once here so cart/checkout math never
+                # re-coerces per line item; derived "_" keys stay out of the
+                # on-disk document (see _public_products).
+                try:
+                    p["_price_f"] = float(p.get("price") or 0)
+                except (TypeError, ValueError):
+                    p["_price_f"] = 0.0
+            _PRODUCTS_CACHE["mtime"] = mtime
+            _PRODUCTS_CACHE["items"] = items
+            _PRODUCTS_CACHE["active"] = tuple(p for p in items if p.get("active", True))
+            _PRODUCTS_CACHE["by_slug"] = {p.get("slug"): p for p in items}
+            _PRODUCTS_CACHE["next_id"] = next_id
+            # Short integer aliases for slugs, used to keep the session cart
+            # cookie compact. Built from the persistent per-product id, so an
+            # id in a cookie keeps meaning the same product across catalog
+            # reorders, adds, and deletes.
+            _PRODUCTS_CACHE["slug_to_id"] = {p.get("slug"): p["id"] for p in items}
+            _PRODUCTS_CACHE["id_to_slug"] = {p["id"]: p.get("slug") for p in items}
+        cached = _PRODUCTS_CACHE["items" if include_inactive else "active"]
+    return list(cached)
+
+
+def _catalog_index():
+    _catalog()  # refresh the cache if products.json changed
+    with _PRODUCTS_LOCK:
+        return _PRODUCTS_CACHE["by_slug"]
 
 
 def _find(slug):
-    slug = (slug or "").strip().lower()
-    for p in _catalog(include_inactive=True):
-        if p.get("slug") == slug:
-            return p
-    return None
+    return _catalog_index().get((slug or "").strip().lower())
+
+
+def _public_products(products):
+    """Products without cache-derived underscore keys, for writing to disk."""
+    return [{k: v for k, v in p.items() if not k.startswith("_")} for p in products]
+
+
+def _write_products(products, next_id=None):
+    """Write the products document, preserving the id counter, and drop the cache."""
+    if next_id is None:
+        with _PRODUCTS_LOCK:
+            next_id = _PRODUCTS_CACHE["next_id"]
+    _write_json(PRODUCTS_PATH, {"products": _public_products(products), "next_product_id": next_id})
+    _invalidate_catalog()
+
+
+def _next_product_id():
+    _catalog()  # refresh the cache if products.json changed
+    with _PRODUCTS_LOCK:
+        return _PRODUCTS_CACHE["next_id"]
+
+
+def _encode_cart(cart):
+    """slug->qty dict to the compact [[id, qty], ...] stored in the session.
+
+    Integer ids keep the signed cookie small; slugs without an id (product
+    deleted mid-session) are kept as strings so the entry survives.
+    """
+    _catalog()
+    with _PRODUCTS_LOCK:
+        slug_to_id = _PRODUCTS_CACHE["slug_to_id"]
+    return [[slug_to_id.get(slug, slug), qty] for slug, qty in cart.items()]
+
+
+def _decode_cart(raw):
+    """Session cart (compact pairs, or a legacy slug->qty dict) to slug->qty."""
+    _catalog()
+    with _PRODUCTS_LOCK:
+        id_to_slug = _PRODUCTS_CACHE["id_to_slug"]
+    cart = {}
+    pairs = raw.items() if isinstance(raw, dict) else (raw if isinstance(raw, list) else ())
+    for pair in pairs:
+        try:
+            key, qty = pair
+            qty = int(qty)
+        except (TypeError, ValueError):
+            continue
+        slug = id_to_slug.get(key) if isinstance(key, int) else key
+        if isinstance(slug, str):
+            cart[slug] = qty
+    return cart
 
 
 # -------------------------
 # Cart + Admin auth
 # -------------------------
-def _cart():
-    c = session.get("cart")
-    if not isinstance(c, dict):
-        c = {}
-    session["cart"] = c
-    return c
-
-
-def _cart_count():
-    return sum(int(v) for v in _cart().values())
+@app.before_request
+def _load_cart():
+    # Load the session cart once per request. Reading never touches the
+    # session, so pure GETs don't mark it dirty and force a cookie re-sign;
+    # mutating handlers assign session["cart"] themselves.
+    if request.endpoint in ("health", "static"):
+        g.cart = {}
+        g.cart_count = 0
+        return
+    cart = _decode_cart(session.get("cart"))
+    g.cart = cart
+    g.cart_count = sum(cart.values())
 
 
 def _admin_allowed():
-    return (request.args.get("k") or "") == ADMIN_KEY
+    # compare_digest avoids leaking the key through comparison timing;
+    # the result is cached on g since some handlers check more than once.
+    if not hasattr(g, "_admin_ok"):
+        g._admin_ok = hmac.compare_digest(request.args.get("k") or "", ADMIN_KEY)
+    return g._admin_ok
 
 
 # -------------------------
 # Routes
 # -------------------------
+def _render_catalog_page(template, **ctx):
+    """Render a catalog-backed page with conditional-GET support.
+
+    The ETag covers the products.json mtime, the language, and the cart
+    count, so repeat visitors get a 304 until any of those change. Pages
+    carrying a one-time flash message are never answered with a 304.
+    """
+    has_flash = "_flashes" in session
+    resp = make_response(render_template(template, **ctx))
+    if has_flash:
+        return resp
+    try:
+        mtime = os.path.getmtime(PRODUCTS_PATH)
+    except OSError:
+        return resp
+    resp.last_modified = mtime
+    resp.set_etag(f"{int(mtime)}-{g.lang}-{g.cart_count}", weak=True)
+    return resp.make_conditional(request)
+
+
 @app.get("/")
 def index():
     get_lang()
-    return render_template("index.html", products=_catalog(), cart_count=_cart_count())
+    return _render_catalog_page("index.html", products=_catalog())
 
 
 @app.get("/p/<slug>")
@@ -124,7 +381,7 @@ def product(slug):
     p = _find(slug)
     if not p or not p.get("active", True):
         return ("Not Found", 404)
-    return render_template("product.html", p=p, cart_count=_cart_count())
+    return _render_catalog_page("product.html", p=p)
 
 
 @app.post("/cart/add")
@@ -136,34 +393,40 @@ def cart_add():
     if not p or not p.get("active", True):
         return redirect(url_for("index", lang=lang))
 
-    c = _cart()
-    c[slug] = int(c.get(slug, 0)) + qty
-    session["cart"] = c
-    flash("已加入购物车" if lang == "zh" else "Added to cart.", "success")
+    c = g.cart
+    c[slug] = c.get(slug, 0) + qty
+    session["cart"] = _encode_cart(c)
+    flash(_MSGS["cart_added"][lang], "success")
     return redirect(url_for("cart", lang=lang))
 
 
-@app.get("/cart")
-def cart():
-    get_lang()
-    c = _cart()
+def _cart_snapshot(cart):
+    """Resolve a slug->qty cart into line items + total via the slug index."""
+    idx = _catalog_index()
     items = []
     total = 0.0
-    for slug, qty in c.items():
-        p = _find(slug)
+    for slug, qty in cart.items():
+        p = idx.get(slug)
         if not p:
             continue
-        price = float(p.get("price") or 0)
-        line = price * int(qty)
+        price = p["_price_f"]
+        line = price * qty
         total += line
-        items.append({"slug": slug, "qty": int(qty), "price": price, "line_total": line, "p": p})
-    return render_template("cart.html", items=items, total=total, cart_count=_cart_count())
+        items.append({"slug": slug, "qty": qty, "price": price, "line_total": line, "p": p})
+    return items, total
+
+
+@app.get("/cart")
+def cart():
+    get_lang()
+    items, total = _cart_snapshot(g.cart)
+    return render_template("cart.html", items=items, total=total)
 
 
 @app.post("/cart/update")
 def cart_update():
     lang = get_lang()
-    c = _cart()
+    c = g.cart
     for k, v in request.form.items():
         if not k.startswith("qty_"):
             continue
@@ -173,28 +436,19 @@ def cart_update():
             c.pop(slug, None)
         else:
             c[slug] = max(1, min(n, 99))
-    session["cart"] = c
-    flash("购物车已更新" if lang == "zh" else "Cart updated.", "success")
+    session["cart"] = _encode_cart(c)
+    flash(_MSGS["cart_updated"][lang], "success")
     return redirect(url_for("cart", lang=lang))
 
 
 @app.route("/checkout", methods=["GET", "POST"])
 def checkout():
     lang = get_lang()
-    c = _cart()
+    c = g.cart
     if not c:
         return redirect(url_for("index", lang=lang))
 
-    snapshot = []
-    total = 0.0
-    for slug, qty in c.items():
-        p = _find(slug)
-        if not p:
-            continue
-        price = float(p.get("price") or 0)
-        line = price * int(qty)
-        total += line
-        snapshot.append({"slug": slug, "qty": int(qty), "price": price, "line_total": line})
+    snapshot, total = _cart_snapshot(c)
 
     if request.method == "POST":
         buyer_name = (request.form.get("buyer_name") or "").strip()
@@ -203,36 +457,37 @@ def checkout():
         note = (request.form.get("note") or "").strip()
 
         if not buyer_name or not buyer_contact:
-            flash("请填写姓名和联系方式" if lang == "zh" else "Please enter name and contact.", "warning")
-            return render_template("checkout.html", items=snapshot, total=total, form=request.form, cart_count=_cart_count())
+            flash(_MSGS["need_contact"][lang], "warning")
+            return render_template("checkout.html", items=snapshot, total=total, form=request.form)
 
-        order_id = "CH" + datetime.utcnow().strftime("%y%m%d") + secrets.token_hex(3)
+        now = datetime.utcnow()
+        order_id = "CH" + now.strftime("%y%m%d") + secrets.token_hex(3)
         order = {
             "id": order_id,
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": now.isoformat(),
             "buyer_name": buyer_name,
             "buyer_contact": buyer_contact,
             "address": address,
             "note": note,
-            "line_items": snapshot,
+            # the resolved product dicts are for rendering only
+            "line_items": [{k: v for k, v in it.items() if k != "p"} for it in snapshot],
             "total": total,
             "status": "new",
             "lang": lang
         }
-        payload = _read_json(ORDERS_PATH, {"orders": []})
-        payload["orders"].insert(0, order)
-        _write_json(ORDERS_PATH, payload)
+        _ensure_data()
+        _append_jsonl(ORDERS_PATH, order, fsync=True)  # orders must survive a crash
 
-        session["cart"] = {}
+        session["cart"] = []
         return redirect(url_for("success", order_id=order_id, lang=lang))
 
-    return render_template("checkout.html", items=snapshot, total=total, form={}, cart_count=_cart_count())
+    return render_template("checkout.html", items=snapshot, total=total, form={})
 
 
 @app.get("/success/<order_id>")
 def success(order_id):
     get_lang()
-    return render_template("success.html", order_id=order_id, cart_count=_cart_count())
+    return render_template("success.html", order_id=order_id)
 
 
 @app.post("/message")
@@ -243,19 +498,18 @@ def message():
     msg = (request.form.get("message") or "").strip()
 
     if not msg:
-        flash("请填写消息内容" if lang == "zh" else "Please enter a message.", "warning")
+        flash(_MSGS["need_message"][lang], "warning")
         return redirect(url_for("index", lang=lang))
 
-    payload = _read_json(MESSAGES_PATH, {"messages": []})
-    payload["messages"].insert(0, {
+    _ensure_data()
+    _append_jsonl(MESSAGES_PATH, {
         "created_at": datetime.utcnow().isoformat(),
         "name": name,
         "contact": contact,
         "message": msg,
         "lang": lang
     })
-    _write_json(MESSAGES_PATH, payload)
-    flash("消息已发送" if lang == "zh" else "Message sent.", "success")
+    flash(_MSGS["msg_sent"][lang], "success")
     return redirect(url_for("index", lang=lang))
 
 
@@ -265,11 +519,16 @@ def admin():
     if not _admin_allowed():
         return ("Forbidden", 403)
 
+    try:
+        limit = max(1, min(int(request.args.get("limit") or 200), 5000))
+    except ValueError:
+        limit = 200
+
     products = _catalog(include_inactive=True)
-    orders = _read_json(ORDERS_PATH, {"orders": []}).get("orders", [])
-    messages = _read_json(MESSAGES_PATH, {"messages": []}).get("messages", [])
+    orders = _tail_jsonl(ORDERS_PATH, limit)
+    messages = _tail_jsonl(MESSAGES_PATH, limit)
 
-    return render_template("admin.html", products=products, orders=orders, messages=messages, k=request.args.get("k"), cart_count=_cart_count())
+    return render_template("admin.html", products=products, orders=orders, messages=messages, k=request.args.get("k"))
 
 
 @app.post("/admin/product")
@@ -279,14 +538,17 @@ def admin_product():
         return ("Forbidden", 403)
 
     action = (request.form.get("action") or "").strip()
-    payload = _read_json(PRODUCTS_PATH, {"products": []})
-    products = payload.get("products", [])
+    # Start from the cached parsed catalog rather than re-reading the file;
+    # the cache is invalidated right after every write below.
+    products = _catalog(include_inactive=True)
 
     if action == "add":
         slug = (request.form.get("slug") or "").strip().lower() or ("p" + secrets.token_hex(4))
         images = [s.strip() for s in (request.form.get("images") or "").split(",") if s.strip()]
+        new_id = _next_product_id()
         products.insert(0, {
             "slug": slug,
+            "id": new_id,
             "active": True,
             "price": float(request.form.get("price") or 0),
             "title_zh": (request.form.get("title_zh") or "").strip() or "新窗花",
@@ -297,9 +559,8 @@ def admin_product():
             "desc_en": (request.form.get("desc_en") or "").strip(),
             "images": images
         })
-        payload["products"] = products
-        _write_json(PRODUCTS_PATH, payload)
-        flash("已添加商品" if lang == "zh" else "Product added.", "success")
+        _write_products(products, next_id=new_id + 1)
+        flash(_MSGS["product_added"][lang], "success")
         return redirect(url_for("admin", lang=lang, k=request.args.get("k")))
 
     slug = (request.form.get("slug") or "").strip().lower()
@@ -319,15 +580,13 @@ def admin_product():
             p["desc_en"] = (request.form.get("desc_en") or "").strip()
             p["images"] = [s.strip() for s in (request.form.get("images") or "").split(",") if s.strip()]
         elif action == "delete":
-            payload["products"] = [x for x in products if x.get("slug") != slug]
-            _write_json(PRODUCTS_PATH, payload)
+            _write_products([x for x in products if x.get("slug") != slug])
             return redirect(url_for("admin", lang=lang, k=request.args.get("k")))
 
-        payload["products"] = products
-        _write_json(PRODUCTS_PATH, payload)
+        _write_products(products)
         break
 
-    flash("已更新" if lang == "zh" else "Updated.", "success")
+    flash(_MSGS["updated"][lang], "success")
     return redirect(url_for("admin", lang=lang, k=request.args.get("k")))
 
 
@@ -336,18 +595,28 @@ def export_orders():
     if not _admin_allowed():
         return ("Forbidden", 403)
 
-    orders = _read_json(ORDERS_PATH, {"orders": []}).get("orders", [])
-    rows = [["order_id", "created_at", "buyer_name", "buyer_contact", "total", "status", "items"]]
-    for o in orders:
-        items = "; ".join([f"{i.get('slug')} x{i.get('qty')}" for i in (o.get("items") or [])])
-        rows.append([o.get("id",""), o.get("created_at",""), o.get("buyer_name",""), o.get("buyer_contact",""),
-                     str(o.get("total","")), o.get("status",""), items])
-
-    out = []
-    for r in rows:
-        out.append(",".join(["\"" + str(x).replace("\"", "\"\"") + "\"" for x in r]))
+    _ensure_data()
 
-    resp = Response("\n".join(out) + "\n", mimetype="text/csv")
+    def gen():
+        # One CSV row in memory at a time: orders stream straight from the
+        # JSONL file (chronological order) through a reused StringIO.
+        buf = io.StringIO()
+        w = csv.writer(buf)
+
+        def encode(row):
+            w.writerow(row)
+            val = buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+            return val
+
+        yield encode(["order_id", "created_at", "buyer_name", "buyer_contact", "total", "status", "items"])
+        for o in _iter_jsonl(ORDERS_PATH):
+            items = "; ".join([f"{i.get('slug')} x{i.get('qty')}" for i in (o.get("line_items") or [])])
+            yield encode([o.get("id",""), o.get("created_at",""), o.get("buyer_name",""), o.get("buyer_contact",""),
+                          o.get("total",""), o.get("status",""), items])
+
+    resp = Response(stream_with_context(gen()), mimetype="text/csv")
     resp.headers["Content-Disposition"] = "attachment; filename=chuanghua_orders.csv"
     return resp
 
@@ -358,4 +627,6 @@ def health():
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", "5000")), debug=True)
+    # Local development only; run production through gunicorn (see wsgi.py).
+    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", "5000")),
+            debug=os.environ.get("FLASK_DEBUG") == "1")
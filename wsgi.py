@@ -0,0 +1,10 @@
+"""WSGI entrypoint.
+
+Run with:
+
+    gunicorn -w $(nproc) --preload wsgi:application
+
+--preload imports the app (and warms the product cache) once in the
+master, so workers share it via copy-on-write memory.
+"""
+from app import app as application